@@ -15,6 +15,17 @@ def parse_ignore_patterns(patterns_str: str) -> List[str]:
     return [pattern.strip() for pattern in patterns_str.split(',') if pattern.strip()]
 
 
+def positive_int(value: str) -> int:
+    """Parse a command-line integer that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def format_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -66,6 +77,30 @@ def main():
         help='Include binary file content (not recommended for large files)'
     )
     
+    parser.add_argument(
+        '--jobs', '-j',
+        type=positive_int,
+        default=None,
+        help='Number of threads used to read files (default: number of CPUs)'
+    )
+    
+    statx_group = parser.add_mutually_exclusive_group()
+    statx_group.add_argument(
+        '--statx',
+        dest='use_statx',
+        action='store_const',
+        const=True,
+        default=None,
+        help='Stat files with statx(2) (Linux; default: only on network filesystems)'
+    )
+    statx_group.add_argument(
+        '--no-statx',
+        dest='use_statx',
+        action='store_const',
+        const=False,
+        help='Always stat files with os.stat, even on network filesystems'
+    )
+    
     parser.add_argument(
         '--quiet', '-q',
         action='store_true',
@@ -113,7 +148,9 @@ def main():
         archiver = CodebaseArchiver(
             ignore_patterns=ignore_patterns,
             max_file_size=args.max_size,
-            include_binary=args.include_binary
+            include_binary=args.include_binary,
+            jobs=args.jobs,
+            use_statx=args.use_statx
         )
         
         # Generate archive
@@ -131,9 +168,10 @@ def main():
             print(f"\n📊 Archive contains:")
             
             # Quick stats from the archiver's last run
-            print(f"   📁 Directories: {archiver._extract_metadata(codebase_path)['total_directories']}")
-            print(f"   📄 Files: {archiver._extract_metadata(codebase_path)['total_files']}")
-            print(f"   💾 Total size: {format_size(archiver._extract_metadata(codebase_path)['total_size'])}")
+            metadata = archiver.last_metadata
+            print(f"   📁 Directories: {metadata['total_directories']}")
+            print(f"   📄 Files: {metadata['total_files']}")
+            print(f"   💾 Total size: {format_size(metadata['total_size'])}")
         else:
             # Just print the output path for scripts
             print(str(result_path))
@@ -2,12 +2,74 @@
 
 import os
 import re
+import fnmatch
+import functools
 import mimetypes
+import mmap
+from collections import Counter, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import quoteattr
+
+from . import _statx
+from ._statx import AnyStat
+
+
+if hasattr(ET, 'indent'):
+    _indent = ET.indent
+else:
+    def _indent(tree, space: str = '  ', level: int = 0) -> None:
+        """Indent an element tree in place; fallback for ET.indent on Python 3.8."""
+        elem = tree.getroot() if isinstance(tree, ET.ElementTree) else tree
+        if not len(elem):
+            return
+        child_indent = '\n' + space * (level + 1)
+        if not elem.text or not elem.text.strip():
+            elem.text = child_indent
+        for child in elem:
+            _indent(child, space, level + 1)
+            if not child.tail or not child.tail.strip():
+                child.tail = child_indent
+        if not child.tail.strip():
+            child.tail = '\n' + space * level
+
+
+def _start_tag(elem: ET.Element) -> str:
+    """Serialize only the opening tag of an element, for streamed output."""
+    attrs = ''.join(f' {key}={quoteattr(value)}' for key, value in elem.items())
+    return f'<{elem.tag}{attrs}>'
+
+
+@functools.lru_cache(maxsize=4096)
+def _isoformat(timestamp: float) -> str:
+    """Format a timestamp as local ISO 8601; memoized since files often share times."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def _write_element(f: BinaryIO, elem: ET.Element, level: int) -> None:
+    """Indent an element for its depth and serialize it to the output as UTF-8."""
+    _indent(elem, space='  ', level=level)
+    f.write(b'  ' * level)
+    ET.ElementTree(elem).write(f, encoding='utf-8', xml_declaration=False,
+                               short_empty_elements=True)
+    f.write(b'\n')
+
+
+class _Entry(NamedTuple):
+    """
+    A filesystem entry collected by a single walk of the codebase.
+    
+    file_type is None for directories, except symlinked directories, which
+    are recorded as 'symlink' leaves and never descended into.
+    """
+    path: str
+    name: str
+    is_dir: bool
+    stat: Optional[AnyStat]
+    file_type: Optional[str]
 
 
 class FileTypeDetector:
@@ -68,31 +130,43 @@ class FileTypeDetector:
         'package-lock.json': 'lockfile', 'yarn.lock': 'lockfile', 'Pipfile.lock': 'lockfile'
     }
     
-    def detect_type(self, file_path: Path) -> str:
+    # Every extension table merged once, so detection is a single lookup
+    _ALL_EXTENSIONS = {
+        **PROGRAMMING_EXTENSIONS, **CONFIG_EXTENSIONS, **DOCUMENTATION_EXTENSIONS,
+        **WEB_EXTENSIONS, **DATA_EXTENSIONS, **MEDIA_EXTENSIONS
+    }
+    
+    _PROGRAMMING_LANG_SET = frozenset(PROGRAMMING_EXTENSIONS.values())
+    
+    # Types whose content is skipped without opening the file
+    BINARY_TYPES = frozenset({'image', 'audio', 'video', 'binary', 'excel', 'sqlite', 'database'})
+    
+    # Document and data formats that may be binary, so their bytes are probed
+    PROBE_TYPES = frozenset({'word', 'pdf', 'rtf', 'spreadsheet', 'parquet', 'arrow', 'avro'})
+    
+    # Types known to be text, included without probing their bytes
+    TEXT_TYPES = (
+        _PROGRAMMING_LANG_SET | frozenset(CONFIG_EXTENSIONS.values()) |
+        frozenset(WEB_EXTENSIONS.values()) | frozenset(SPECIAL_FILES.values()) |
+        ((frozenset(DOCUMENTATION_EXTENSIONS.values()) | frozenset(DATA_EXTENSIONS.values()))
+         - BINARY_TYPES - PROBE_TYPES) |
+        frozenset({'vector'})  # .svg is XML
+    )
+    
+    def detect_type(self, file_path: Union[str, Path]) -> str:
         """Detect the type of a file based on its name and extension."""
-        filename = file_path.name
-        suffix = file_path.suffix.lower()
-        
-        # Check special files first
-        if filename in self.SPECIAL_FILES:
-            return self.SPECIAL_FILES[filename]
-        
-        # Check by extension
-        if suffix in self.PROGRAMMING_EXTENSIONS:
-            return self.PROGRAMMING_EXTENSIONS[suffix]
-        elif suffix in self.CONFIG_EXTENSIONS:
-            return self.CONFIG_EXTENSIONS[suffix]
-        elif suffix in self.DOCUMENTATION_EXTENSIONS:
-            return self.DOCUMENTATION_EXTENSIONS[suffix]
-        elif suffix in self.WEB_EXTENSIONS:
-            return self.WEB_EXTENSIONS[suffix]
-        elif suffix in self.DATA_EXTENSIONS:
-            return self.DATA_EXTENSIONS[suffix]
-        elif suffix in self.MEDIA_EXTENSIONS:
-            return self.MEDIA_EXTENSIONS[suffix]
-        
-        # Try to use mimetypes as fallback
-        mime_type, _ = mimetypes.guess_type(str(file_path))
+        filename = os.path.basename(file_path)
+        # Same rules as PurePath.suffix, without constructing a Path
+        dot = filename.rfind('.')
+        suffix = filename[dot:].lower() if 0 < dot < len(filename) - 1 else ''
+        
+        return (self.SPECIAL_FILES.get(filename)
+                or self._ALL_EXTENSIONS.get(suffix)
+                or self._mime_fallback(filename, suffix))
+    
+    def _mime_fallback(self, filename: str, suffix: str) -> str:
+        """Classify a file with no known name or extension via mimetypes."""
+        mime_type, _ = mimetypes.guess_type(filename)
         if mime_type:
             if mime_type.startswith('text/'):
                 return 'text'
@@ -114,10 +188,32 @@ class FileTypeDetector:
 class CodebaseArchiver:
     """Main class for archiving codebases to XML."""
     
+    # Characters that are invalid in XML 1.0, as inclusive ranges
+    # Valid: #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD] | [#x10000-#x10FFFF]
+    _XML_INVALID_RANGES = [
+        (0x00, 0x08), (0x0B, 0x0C), (0x0E, 0x1F), (0xD800, 0xDFFF), (0xFFFE, 0xFFFF)
+    ]
+    # Translation table mapping each invalid character to U+FFFD
+    _XML_INVALID = {
+        code: 0xFFFD for low, high in _XML_INVALID_RANGES for code in range(low, high + 1)
+    }
+    # Matching character class, to skip clean content without copying it
+    _XML_INVALID_RE = re.compile('[' + ''.join(
+        f'\\u{low:04x}-\\u{high:04x}' for low, high in _XML_INVALID_RANGES
+    ) + ']')
+    
+    # Files above this size are decoded from a memory map instead of read()
+    _MMAP_THRESHOLD = 256 * 1024
+    
+    # Large output buffer so big archives need few write() syscalls
+    _OUTPUT_BUFFER_SIZE = 1024 * 1024
+    
     def __init__(self, 
                  ignore_patterns: Optional[List[str]] = None,
                  max_file_size: int = 10 * 1024 * 1024,  # 10MB
-                 include_binary: bool = False):
+                 include_binary: bool = False,
+                 jobs: Optional[int] = None,
+                 use_statx: Optional[bool] = None):
         """
         Initialize the archiver.
         
@@ -125,90 +221,161 @@ class CodebaseArchiver:
             ignore_patterns: List of glob patterns to ignore
             max_file_size: Maximum file size to include content for (bytes)
             include_binary: Whether to include binary file content
+            jobs: Number of threads reading files (default: number of CPUs)
+            use_statx: Stat files with statx(AT_STATX_DONT_SYNC) on Linux
+                (default: only when the codebase is on a network filesystem)
         """
         self.file_detector = FileTypeDetector()
         self.ignore_patterns = ignore_patterns or [
             '*.pyc', '__pycache__', '.git', '.svn', '.hg', 
             'node_modules', '.DS_Store', '*.log', '*.tmp',
-            '.venv', 'venv', '.env', '.idea', '.vscode'
+            '.venv', 'venv', '.env', '.env.*', '.idea', '.vscode'
         ]
         self.max_file_size = max_file_size
         self.include_binary = include_binary
+        if jobs is not None and jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {jobs}")
+        # One thread per CPU; on a single CPU this is the sequential path
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.use_statx = use_statx
         
-    def _should_ignore(self, path: Path) -> bool:
-        """Check if a path should be ignored based on patterns."""
-        path_str = str(path)
-        name = path.name
-        
-        for pattern in self.ignore_patterns:
-            if pattern in path_str or self._match_pattern(name, pattern):
-                return True
-        return False
-    
-    def _match_pattern(self, name: str, pattern: str) -> bool:
-        """Simple glob pattern matching."""
-        if '*' in pattern:
-            # Convert glob pattern to regex
-            regex_pattern = pattern.replace('*', '.*').replace('?', '.')
-            return re.match(f'^{regex_pattern}$', name) is not None
-        return name == pattern
-    
-    def _is_text_file(self, file_path: Path) -> bool:
-        """Determine if a file is text-based and should have content included."""
-        if not self.include_binary:
-            file_type = self.file_detector.detect_type(file_path)
-            binary_types = {'image', 'audio', 'video', 'binary', 'excel', 'sqlite', 'database'}
-            if any(bt in file_type for bt in binary_types):
-                return False
+        # Split patterns once: plain names are a set lookup, and all globs are
+        # folded into a single precompiled alternation matched once per name
+        self._ignore_literals = frozenset(
+            p for p in self.ignore_patterns if not any(c in p for c in '*?[')
+        )
+        globs = [fnmatch.translate(p) for p in self.ignore_patterns
+                 if p not in self._ignore_literals]
+        self._ignore_glob = re.compile('|'.join(globs)) if globs else None
+        self.last_metadata: Optional[Dict] = None
         
-        try:
-            # Try to read a small portion as text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                f.read(1024)
+    def _should_ignore(self, name: str) -> bool:
+        """Check if an entry should be ignored based on its name."""
+        if name in self._ignore_literals:
             return True
-        except (UnicodeDecodeError, PermissionError, OSError):
-            return False
+        return self._ignore_glob is not None and self._ignore_glob.match(name) is not None
     
-    def _get_file_stats(self, file_path: Path) -> Dict:
-        """Get file statistics and metadata."""
+    def _scan_dir(self, dir_path: str) -> Iterator[os.DirEntry]:
+        """List a directory's non-ignored entries, directories first, then by lowercase name."""
         try:
-            stat = file_path.stat()
-            return {
-                'size': stat.st_size,
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'permissions': oct(stat.st_mode)[-3:]
-            }
-        except (OSError, PermissionError):
-            return {}
+            with os.scandir(dir_path) as it:
+                dir_entries = [e for e in it if not self._should_ignore(e.name)]
+        except (PermissionError, OSError):
+            return iter(())
+        
+        dir_entries.sort(key=lambda e: (not e.is_dir(), e.name.lower()))
+        return iter(dir_entries)
+    
+    def _walk(self, root_path: str) -> Iterator[_Entry]:
+        """
+        Walk the codebase once using os.scandir, yielding entries in tree order.
+        
+        The walk is a preorder traversal over an explicit stack of directory
+        iterators, so arbitrarily deep trees cannot hit the recursion limit.
+        Ignored entries are pruned, so ignored directories are never descended
+        into. Symlinked directories are yielded but their targets are not
+        followed. Files are stat'd and classified exactly once; both are
+        cached on the entry.
+        """
+        # statx is slower than DirEntry.stat() locally; it only helps on network mounts
+        use_statx = self.use_statx
+        if use_statx is None:
+            use_statx = _statx.is_network_filesystem(root_path)
+        
+        stack = [self._scan_dir(root_path)]
+        while stack:
+            dir_entry = next(stack[-1], None)
+            if dir_entry is None:
+                stack.pop()
+                continue
+            
+            if dir_entry.is_dir(follow_symlinks=False):
+                yield _Entry(dir_entry.path, dir_entry.name, True, None, None)
+                stack.append(self._scan_dir(dir_entry.path))
+            elif dir_entry.is_file():
+                try:
+                    stat = _statx.stat(dir_entry) if use_statx else dir_entry.stat()
+                except (OSError, PermissionError):
+                    stat = None
+                yield _Entry(dir_entry.path, dir_entry.name, False, stat,
+                             self.file_detector.detect_type(dir_entry.name))
+            elif dir_entry.is_dir():
+                # Symlink to a directory: list it, but don't follow it
+                yield _Entry(dir_entry.path, dir_entry.name, True, None, 'symlink')
+    
+    def _is_binary_type(self, file_type: str) -> bool:
+        """Check whether a detected type is known to be binary, before opening the file."""
+        return not self.include_binary and file_type in self.file_detector.BINARY_TYPES
+    
+    def _is_text_file(self, file_type: str, raw: Union[bytes, mmap.mmap]) -> bool:
+        """Determine whether content should be included as text, from bytes already read."""
+        if self.include_binary or file_type in self.file_detector.TEXT_TYPES:
+            return True
+        # Unknown type: NUL bytes essentially never occur in text files
+        return b'\x00' not in raw[:8192]
+    
+    def _read_text(self, file_path: str, size: int, file_type: str) -> Optional[str]:
+        """
+        Read a file once and decode it, or return None if it looks binary.
+        
+        Large files are decoded straight from a memory map, avoiding a full
+        copy of the file into a bytes object before decoding.
+        """
+        with open(file_path, 'rb') as f:
+            if size > self._MMAP_THRESHOLD:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if not self._is_text_file(file_type, mm):
+                            return None
+                        return self._decode(mm)
+                except (OSError, ValueError):
+                    # Special files (procfs, pipes, ...) cannot be mapped
+                    pass
+            raw = f.read()
+        
+        if not self._is_text_file(file_type, raw):
+            return None
+        return self._decode(raw)
+    
+    def _decode(self, raw: Union[bytes, mmap.mmap]) -> str:
+        """Decode file bytes as UTF-8 with universal newlines, like text-mode open()."""
+        content = str(raw, 'utf-8', 'ignore')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+    
+    def _get_file_stats(self, stat: AnyStat) -> Dict:
+        """Get file statistics and metadata from a cached stat result."""
+        return {
+            'size': stat.st_size,
+            'modified': _isoformat(stat.st_mtime),
+            'created': _isoformat(stat.st_ctime),
+            'permissions': format(stat.st_mode & 0o777, '03o')
+        }
     
     def _count_lines(self, content: str) -> int:
         """Count the number of lines in content."""
-        return len(content.splitlines()) if content else 0
+        if not content:
+            return 0
+        # Count newlines in C instead of materializing a list of lines
+        return content.count('\n') + (0 if content.endswith('\n') else 1)
     
     def _clean_xml_content(self, content: str) -> str:
         """Clean content to be XML-safe by removing invalid characters."""
         if not content:
             return content
         
-        # Remove characters that are invalid in XML 1.0
-        # Valid: #x9 | #xA | #xD | [#x20-#xD7FF] | [#xE000-#xFFFD] | [#x10000-#x10FFFF]
-        valid_chars = []
-        for char in content:
-            code = ord(char)
-            if (code == 0x09 or code == 0x0A or code == 0x0D or 
-                (0x20 <= code <= 0xD7FF) or 
-                (0xE000 <= code <= 0xFFFD) or 
-                (0x10000 <= code <= 0x10FFFF)):
-                valid_chars.append(char)
-            else:
-                # Replace invalid characters with placeholder
-                valid_chars.append('�')
-        
-        return ''.join(valid_chars)
+        # Most files contain no invalid characters; skip the copy for those
+        if self._XML_INVALID_RE.search(content) is None:
+            return content
+        # Replace invalid characters with a placeholder
+        return content.translate(self._XML_INVALID)
     
-    def _extract_metadata(self, codebase_path: Path) -> Dict:
+    def _extract_metadata(self, codebase_path: Path, entries: Optional[List[_Entry]] = None) -> Dict:
         """Extract metadata about the codebase."""
+        if entries is None:
+            entries = list(self._walk(os.fspath(codebase_path)))
+        
         metadata = {
             'name': codebase_path.name,
             'path': str(codebase_path.absolute()),
@@ -216,60 +383,136 @@ class CodebaseArchiver:
             'total_files': 0,
             'total_directories': 0,
             'total_size': 0,
-            'file_types': {},
-            'languages': set()
+            'file_types': Counter(),
+            'languages': []
         }
         
-        for item in codebase_path.rglob('*'):
-            if self._should_ignore(item):
-                continue
-                
-            if item.is_file():
-                metadata['total_files'] += 1
-                try:
-                    size = item.stat().st_size
-                    metadata['total_size'] += size
-                    
-                    file_type = self.file_detector.detect_type(item)
-                    metadata['file_types'][file_type] = metadata['file_types'].get(file_type, 0) + 1
-                    
-                    # Track programming languages
-                    if file_type in self.file_detector.PROGRAMMING_EXTENSIONS.values():
-                        metadata['languages'].add(file_type)
-                        
-                except (OSError, PermissionError):
-                    pass
-            elif item.is_dir():
+        for entry in entries:
+            if entry.is_dir:
                 metadata['total_directories'] += 1
+                continue
+            
+            metadata['total_files'] += 1
+            if entry.stat is None:
+                continue
+            metadata['total_size'] += entry.stat.st_size
+            
+            metadata['file_types'][entry.file_type] += 1
         
-        metadata['languages'] = list(metadata['languages'])
+        # Track programming languages once per distinct type, not once per file
+        metadata['languages'] = sorted(
+            file_type for file_type in metadata['file_types']
+            if file_type in self.file_detector._PROGRAMMING_LANG_SET
+        )
         return metadata
     
-    def _build_structure_tree(self, root_path: Path, current_path: Path) -> ET.Element:
-        """Build the directory structure tree recursively."""
-        rel_path = current_path.relative_to(root_path)
+    def _build_structure_tree(self, root_path: str, entries: List[_Entry]) -> ET.Element:
+        """
+        Build the directory structure tree from walked entries.
+        
+        The walk yields entries in tree order, so the tree is built in one
+        iterative pass: a stack holds the open directories, keyed by their
+        path with a trailing separator, and each entry is attached to the
+        directory its path starts with.
+        """
+        root_elem = ET.Element('directory')
+        root_elem.set('name', '/')
+        root_elem.set('path', root_path)
+        stack = [(os.path.join(root_path, ''), root_elem)]
+        
+        for entry in entries:
+            # entry.path is always the parent (with trailing separator) + name
+            parent_path = entry.path[:-len(entry.name)]
+            while stack[-1][0] != parent_path:
+                stack.pop()
+            parent_elem = stack[-1][1]
+            
+            if entry.is_dir:
+                dir_elem = ET.SubElement(parent_elem, 'directory')
+                dir_elem.set('name', entry.name)
+                dir_elem.set('path', entry.path)
+                if entry.file_type:
+                    dir_elem.set('type', entry.file_type)
+                stack.append((entry.path + os.sep, dir_elem))
+            else:
+                file_elem = ET.SubElement(parent_elem, 'file')
+                file_elem.set('name', entry.name)
+                file_elem.set('type', entry.file_type)
         
-        if current_path.is_file():
+        return root_elem
+    
+    def _build_file_element(self, entry: _Entry) -> ET.Element:
+        """Build the standalone <file> element, with content, for a walked file."""
+        file_path = entry.path
+        try:
+            # Only re-stat when the walk could not; this raises the original error
+            stat = entry.stat or os.stat(file_path)
             file_elem = ET.Element('file')
-            file_elem.set('name', current_path.name)
-            file_elem.set('type', self.file_detector.detect_type(current_path))
-            return file_elem
-        else:
-            dir_elem = ET.Element('directory')
-            dir_elem.set('name', current_path.name if current_path != root_path else '/')
-            dir_elem.set('path', str(current_path))
+            file_elem.set('name', entry.name)
+            file_elem.set('path', file_path)
+            file_type = entry.file_type
+            file_elem.set('type', file_type)
             
-            # Add children
-            try:
-                children = sorted(current_path.iterdir(), key=lambda x: (x.is_file(), x.name.lower()))
-                for child in children:
-                    if not self._should_ignore(child):
-                        child_elem = self._build_structure_tree(root_path, child)
-                        dir_elem.append(child_elem)
-            except (PermissionError, OSError):
-                pass
-                
-            return dir_elem
+            # Add file stats
+            stats = self._get_file_stats(stat)
+            for key, value in stats.items():
+                file_elem.set(key, str(value))
+            
+            # Add content if it's a text file and not too large
+            if stat.st_size > self.max_file_size:
+                note_elem = ET.SubElement(file_elem, 'note')
+                note_elem.text = f"File too large ({stat.st_size} bytes)"
+            elif self._is_binary_type(file_type):
+                note_elem = ET.SubElement(file_elem, 'note')
+                note_elem.text = "Binary file - content skipped"
+            else:
+                try:
+                    content = self._read_text(file_path, stat.st_size, file_type)
+                except (PermissionError, OSError):
+                    # Add note about unreadable file
+                    note_elem = ET.SubElement(file_elem, 'note')
+                    note_elem.text = "Content could not be read"
+                else:
+                    if content is None:
+                        note_elem = ET.SubElement(file_elem, 'note')
+                        note_elem.text = "Binary file - content skipped"
+                    elif content.strip():  # Only add non-empty content
+                        file_elem.set('lines', str(self._count_lines(content)))
+                        content_elem = ET.SubElement(file_elem, 'content')
+                        # Clean content for XML - remove invalid XML characters
+                        clean_content = self._clean_xml_content(content)
+                        content_elem.text = clean_content
+        except (OSError, PermissionError) as e:
+            # Add entry for inaccessible file
+            file_elem = ET.Element('file')
+            file_elem.set('name', entry.name)
+            file_elem.set('path', file_path)
+            file_elem.set('type', 'inaccessible')
+            note_elem = ET.SubElement(file_elem, 'note')
+            note_elem.text = f"Access denied: {str(e)}"
+        
+        return file_elem
+    
+    def _map_file_elements(self, executor: Executor, files: List[_Entry]) -> Iterator[ET.Element]:
+        """
+        Build <file> elements on the executor, yielding them in order.
+        
+        Unlike Executor.map, which submits every file up front, at most
+        2 * jobs files are in flight, so finished elements waiting to be
+        written cannot pile up in memory when output is the bottleneck.
+        """
+        pending = deque()
+        for entry in files:
+            if len(pending) >= 2 * self.jobs:
+                yield pending.popleft().result()
+            pending.append(executor.submit(self._build_file_element, entry))
+        while pending:
+            yield pending.popleft().result()
+    
+    def _write_file_elements(self, f: BinaryIO, file_elems: Iterator[ET.Element]) -> None:
+        """Serialize <file> elements to the output one at a time."""
+        for file_elem in file_elems:
+            _write_element(f, file_elem, level=2)
     
     def archive_codebase(self, codebase_path: Path, output_path: Optional[Path] = None) -> Path:
         """
@@ -293,17 +536,22 @@ class CodebaseArchiver:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_path = codebase_path / f"{codebase_path.name}_archive_{timestamp}.xml"
         
+        # Walk the codebase once; every section below reuses these entries
+        root_path = os.fspath(codebase_path)
+        entries = list(self._walk(root_path))
+        
         # Extract metadata
-        metadata = self._extract_metadata(codebase_path)
+        metadata = self._extract_metadata(codebase_path, entries)
+        self.last_metadata = metadata
         
-        # Create root XML element
+        # Root element; only its opening tag is written, the sections are streamed
         root = ET.Element('codebase')
         root.set('name', metadata['name'])
         root.set('version', '1.0')
         root.set('timestamp', metadata['timestamp'])
         
-        # Add metadata section
-        meta_elem = ET.SubElement(root, 'metadata')
+        # Build metadata section
+        meta_elem = ET.Element('metadata')
         
         desc_elem = ET.SubElement(meta_elem, 'description')
         desc_elem.text = f"Archived codebase: {metadata['name']}"
@@ -331,72 +579,39 @@ class CodebaseArchiver:
                 lang_elem = ET.SubElement(langs_elem, 'language')
                 lang_elem.text = lang
         
-        # Add structure section
-        structure_elem = ET.SubElement(root, 'structure')
-        structure_tree = self._build_structure_tree(codebase_path, codebase_path)
-        structure_elem.append(structure_tree)
-        
-        # Add files section with content
-        files_elem = ET.SubElement(root, 'files')
-        
-        for file_path in codebase_path.rglob('*'):
-            if file_path.is_file() and not self._should_ignore(file_path):
-                try:
-                    file_elem = ET.SubElement(files_elem, 'file')
-                    file_elem.set('name', file_path.name)
-                    file_elem.set('path', str(file_path))
-                    file_elem.set('type', self.file_detector.detect_type(file_path))
-                    
-                    # Add file stats
-                    stats = self._get_file_stats(file_path)
-                    for key, value in stats.items():
-                        file_elem.set(key, str(value))
-                    
-                    # Add content if it's a text file and not too large
-                    if (file_path.stat().st_size <= self.max_file_size and 
-                        self._is_text_file(file_path)):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                                
-                            if content.strip():  # Only add non-empty content
-                                file_elem.set('lines', str(self._count_lines(content)))
-                                content_elem = ET.SubElement(file_elem, 'content')
-                                # Clean content for XML - remove invalid XML characters
-                                clean_content = self._clean_xml_content(content)
-                                content_elem.text = clean_content
-                        except (UnicodeDecodeError, PermissionError, OSError):
-                            # Add note about unreadable file
-                            note_elem = ET.SubElement(file_elem, 'note')
-                            note_elem.text = "Content could not be read"
-                    else:
-                        # Add note about why content was skipped
-                        note_elem = ET.SubElement(file_elem, 'note')
-                        if file_path.stat().st_size > self.max_file_size:
-                            note_elem.text = f"File too large ({file_path.stat().st_size} bytes)"
-                        else:
-                            note_elem.text = "Binary file - content skipped"
-                            
-                except (OSError, PermissionError) as e:
-                    # Add entry for inaccessible file
-                    file_elem = ET.SubElement(files_elem, 'file')
-                    file_elem.set('name', file_path.name)
-                    file_elem.set('path', str(file_path))
-                    file_elem.set('type', 'inaccessible')
-                    note_elem = ET.SubElement(file_elem, 'note')
-                    note_elem.text = f"Access denied: {str(e)}"
-        
-        # Write XML with pretty formatting
-        xml_str = ET.tostring(root, encoding='unicode')
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent='  ')
-        
-        # Remove empty lines from pretty printing
-        lines = [line for line in pretty_xml.split('\n') if line.strip()]
-        final_xml = '\n'.join(lines)
+        # Build structure section
+        structure_elem = ET.Element('structure')
+        structure_elem.append(self._build_structure_tree(root_path, entries))
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(final_xml)
+        # Stream the document: the header sections are small, while <file>
+        # elements are built and written one at a time so that file contents
+        # never accumulate in memory. They go to a temporary file next to the
+        # output, moved into place only once complete, so an error or Ctrl-C
+        # never leaves a truncated archive behind
+        tmp_path = output_path.with_name(f'.{output_path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'xb', buffering=self._OUTPUT_BUFFER_SIZE) as f:
+                f.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+                f.write(_start_tag(root).encode('utf-8') + b'\n')
+                for section in (meta_elem, structure_elem):
+                    _write_element(f, section, level=1)
+                
+                f.write(b'  <files>\n')
+                files = [entry for entry in entries if not entry.is_dir]
+                if self.jobs > 1:
+                    # Read and clean files on worker threads, written in walk order
+                    with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                        self._write_file_elements(f, self._map_file_elements(executor, files))
+                else:
+                    self._write_file_elements(f, map(self._build_file_element, files))
+                f.write(b'  </files>\n')
+                f.write(b'</codebase>\n')
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
         
         return output_path
\ No newline at end of file